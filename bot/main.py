@@ -3,8 +3,8 @@
 Place this file next to **menu.yaml** and a **.env** containing at least
 `TELEGRAM_TJBOT_TOKEN`.  Run with:
 
-    pip install pytelegrambotapi python-dotenv pyyaml
-    python bot_main.py
+    pip install pytelegrambotapi aiohttp cachetools python-dotenv pyyaml
+    python -m bot.main
 
 This version automatically detects language blocks in `menu.yaml` (e.g.
 `en:` → `menu:`) and renders nested inline-keyboard navigation with Back
@@ -15,20 +15,36 @@ root level.
 from __future__ import annotations
 
 import os
+import re
+import sys
+import asyncio
+import pickle
+import signal
 import logging
 from pathlib import Path
-from functools import lru_cache
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Iterable, Iterator, FrozenSet
 
 import yaml
-from telebot import TeleBot, types
+import aiohttp
+from cachetools import LFUCache
+from telebot import types, asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
 from dotenv import load_dotenv
 
+# Prefer the LibYAML C backend when PyYAML was built against it.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - pure-Python PyYAML
+    from yaml import SafeLoader as _Loader
+
 # ---------------------------------------------------------------------------
 # 1. Domain Model
 # ---------------------------------------------------------------------------
 
+BACK_ROOT = "ROOT"  # callback data that returns to top-level menu
+_CACHE_VERSION = 2  # bump whenever _select_entries' output shape changes
+
 
 @dataclass(slots=True, frozen=True)
 class MenuItem:
@@ -36,45 +52,46 @@ class MenuItem:
     text: str
     answer: Optional[str] = None
     children: Tuple["MenuItem", ...] = field(default_factory=tuple)
+    # Precomputed callback payloads: this node's own, and its Back target.
+    cb_data: str = ""
+    back_data: str = ""
+    # Lowercased word set of `answer`, tokenized once at load for search.
+    answer_words: FrozenSet[str] = frozenset()
 
-    # Recursive helpers ----------------------------------------------------
-
-    def find(self, path: List[str]) -> Optional["MenuItem"]:
-        if not path:
-            return self
-        head, *tail = path
-        for child in self.children:
-            if child.id == head:
-                return child.find(tail)
-        return None
+    # Helpers ----------------------------------------------------------------
 
     def is_leaf(self) -> bool:
         return not self.children
 
-    def breadcrumb(self, path: List[str]) -> str:
-        """Return `Section / Subsection / Item` for display heading."""
-        parts: List[str] = []
-        node = self.find(path)
-        # Walk back towards root
-        while node and path:
-            parts.append(node.text.strip())
-            path = path[:-1]
-            node = self.find(path) if path else None
-        if node:
-            parts.append(node.text.strip())
-        return " / ".join(reversed(parts))
-
 
 # ---------------------------------------------------------------------------
 # 2. Menu Loader – YAML → MenuItem tree
 # ---------------------------------------------------------------------------
 
 
+def _tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
 class MenuLoader:
     def __init__(self, yaml_path: Path, default_lang: str = "en") -> None:
         self.yaml_path = yaml_path
         self.default_lang = default_lang
+        # Identifies this exact menu; anything derived from it keys on this.
+        self.fingerprint: Tuple[int, str] = (
+            yaml_path.stat().st_mtime_ns,
+            default_lang,
+        )
         self.root_items: Tuple[MenuItem, ...] = self._load()
+        # id(child) → parent; MenuItem is frozen so it can't point upwards.
+        self._parents: Dict[int, MenuItem] = {}
+        # Every node keyed by the exact callback_data Telegram sends back.
+        self._by_cb: Dict[str, MenuItem] = self._build_index()
+        # Answered leaves in menu order, plus word → first position in it.
+        self._leaves: Tuple[MenuItem, ...] = tuple(
+            leaf for leaf in self._iter_leaves() if leaf.answer
+        )
+        self._word_index: Dict[str, int] = self._build_word_index()
 
     # Public ----------------------------------------------------------------
 
@@ -84,16 +101,66 @@ class MenuLoader:
     def find_by_path(self, path: List[str]) -> Optional[MenuItem]:
         if not path:
             return None
-        for root in self.root_items:
-            if root.id == path[0]:
-                return root.find(path[1:])
-        return None
+        return self._by_cb.get(":".join(path))
+
+    def find_by_cb(self, cb_data: str) -> Optional[MenuItem]:
+        return self._by_cb.get(cb_data)
+
+    def iter_items(self) -> Iterable[MenuItem]:
+        """Every reachable node, roots included."""
+        return self._by_cb.values()
+
+    def breadcrumb(self, item: MenuItem) -> str:
+        """Return `Section / Subsection / Item` for display heading."""
+        parts: List[str] = []
+        node: Optional[MenuItem] = item
+        # Walk back towards root
+        while node is not None:
+            parts.append(node.text.strip())
+            node = self._parents.get(id(node))
+        return " / ".join(reversed(parts))
+
+    def search(self, query: str) -> Optional[MenuItem]:
+        """First leaf (in menu order) whose answer contains any query word."""
+        hits = [self._word_index[w] for w in _tokenize(query) if w in self._word_index]
+        return self._leaves[min(hits)] if hits else None
 
     # Internal --------------------------------------------------------------
 
     def _load(self) -> Tuple[MenuItem, ...]:
-        with open(self.yaml_path, "r", encoding="utf-8") as fh:
-            raw: Any = yaml.safe_load(fh)
+        """Build the tree from the menu entries (see `_read_entries`)."""
+        return tuple(self._parse_item(node) for node in self._read_entries())
+
+    def _read_entries(self) -> List[Dict[str, Any]]:
+        """Raw YAML menu entries, reusing the pickle cache when it is fresh.
+
+        Only plain YAML data is pickled, never MenuItem objects: those would be
+        tied to the module name the bot ran under (`__main__` vs `bot.main`),
+        and every derived field is recomputed by `_parse_item` on load anyway.
+        """
+        cache = self.yaml_path.with_name(
+            f"{self.yaml_path.stem}.{self.default_lang}.pkl"
+        )
+        key = (_CACHE_VERSION, *self.fingerprint)
+        try:
+            cached_key, entries = pickle.loads(cache.read_bytes())
+            if cached_key == key:
+                return entries
+        except Exception:  # missing, unreadable or stale cache → reparse
+            pass
+
+        entries = self._select_entries()
+        try:
+            cache.write_bytes(
+                pickle.dumps((key, entries), protocol=pickle.HIGHEST_PROTOCOL)
+            )
+        except OSError as exc:  # e.g. read-only mount; caching is optional
+            logging.debug("Menu cache not written: %s", exc)
+        return entries
+
+    def _select_entries(self) -> List[Dict[str, Any]]:
+        # Hand raw bytes to the parser; it detects UTF-8/BOM itself.
+        raw: Any = yaml.load(self.yaml_path.read_bytes(), Loader=_Loader)
 
         # Accept 2 formats:
         # 1) Top-level `menu: [...]`
@@ -110,16 +177,62 @@ class MenuLoader:
                     entries = val["menu"]
                     break
 
-        return tuple(self._parse_item(node) for node in entries)
-
-    def _parse_item(self, node: Dict[str, Any]) -> MenuItem:
+        return [node for node in entries if isinstance(node, dict)]
+
+    def _build_index(self) -> Dict[str, MenuItem]:
+        """Flatten the tree into `{"id:child_id:…": MenuItem}` once."""
+        index: Dict[str, MenuItem] = {}
+        stack = list(reversed(self.root_items))
+        while stack:
+            node = stack.pop()
+            # First occurrence of a duplicate path wins, subtree included.
+            if node.cb_data in index:
+                continue
+            index[node.cb_data] = node
+            for child in node.children:
+                self._parents[id(child)] = node
+            stack.extend(reversed(node.children))
+        return index
+
+    def _iter_leaves(self) -> Iterator[MenuItem]:
+        # Explicit stack instead of nested generators; reversed pushes keep
+        # leaves in menu order.
+        stack = list(reversed(self.root_items))
+        while stack:
+            node = stack.pop()
+            if node.is_leaf():
+                yield node
+            else:
+                stack.extend(reversed(node.children))
+
+    def _build_word_index(self) -> Dict[str, int]:
+        # search() only wants the earliest hit, so keep just that position.
+        index: Dict[str, int] = {}
+        for pos, leaf in enumerate(self._leaves):
+            for word in leaf.answer_words:
+                index.setdefault(word, pos)
+        return index
+
+    def _parse_item(
+        self, node: Dict[str, Any], parent_path: Tuple[str, ...] = ()
+    ) -> MenuItem:
+        # Ids recur in every descendant's path tuple and index key, words in
+        # many answers; interning keeps one shared copy of each string.
+        item_id = sys.intern(str(node.get("id", "")))
+        answer = node.get("answer")
+        path = parent_path + (item_id,)
         child_nodes = [c for c in node.get("children", []) if isinstance(c, dict)]
-        children = tuple(self._parse_item(c) for c in child_nodes)
+        children = tuple(self._parse_item(c, path) for c in child_nodes)
         return MenuItem(
-            id=node.get("id", ""),
+            id=item_id,
             text=node.get("text", ""),
-            answer=node.get("answer"),
+            answer=answer,
             children=children,
+            cb_data=":".join(path),
+            back_data=":".join(parent_path) if parent_path else BACK_ROOT,
+            answer_words=(
+                frozenset(map(sys.intern, _tokenize(answer))) if answer else frozenset()
+            ),
         )
 
 
@@ -127,23 +240,21 @@ class MenuLoader:
 # 3. Keyboard Factory – MenuItem → InlineKeyboardMarkup
 # ---------------------------------------------------------------------------
 
-BACK_ROOT = "ROOT"  # callback data that returns to top-level menu
-
 
 class KeyboardFactory:
     def __init__(self, channel: Optional[str] = None) -> None:
         self.channel = channel
 
     def build(
-        self, parent_path: List[str], items: Tuple[MenuItem, ...]
+        self, parent: Optional[MenuItem], items: Tuple[MenuItem, ...]
     ) -> types.InlineKeyboardMarkup:
+        """Keyboard for `items` shown under `parent` (None = root menu)."""
         kb = types.InlineKeyboardMarkup(row_width=1)
         for itm in items:
-            cb_data = ":".join(parent_path + [itm.id])
-            kb.add(types.InlineKeyboardButton(itm.text, callback_data=cb_data))
+            kb.add(types.InlineKeyboardButton(itm.text, callback_data=itm.cb_data))
 
         # Channel link on root menu
-        if not parent_path and self.channel:
+        if parent is None and self.channel:
             kb.add(
                 types.InlineKeyboardButton(
                     "🔔 Notify Me (Join)",
@@ -152,9 +263,10 @@ class KeyboardFactory:
             )
 
         # Back button on sub-menus
-        if parent_path:
-            prev_cb = ":".join(parent_path[:-1]) if parent_path[:-1] else BACK_ROOT
-            kb.add(types.InlineKeyboardButton("⬅️ Back", callback_data=prev_cb))
+        if parent is not None:
+            kb.add(
+                types.InlineKeyboardButton("⬅️ Back", callback_data=parent.back_data)
+            )
         return kb
 
 
@@ -162,95 +274,209 @@ class KeyboardFactory:
 # 4. Bot Orchestrator
 # ---------------------------------------------------------------------------
 
+LAST_KB_LIMIT = 10_000  # messages whose current keyboard we remember
+SEARCH_CACHE_SIZE = 1024  # normalized free-text queries kept in memory
+API_POOL_SIZE = 100  # concurrent connections to api.telegram.org
+API_KEEPALIVE = 75  # seconds an idle connection stays open for reuse
+
+
+class _PooledSessionManager(asyncio_helper.SessionManager):
+    """One long-lived aiohttp session with a large keep-alive pool.
+
+    telebot's default connector closes idle sockets after 15 s, so bursty
+    traffic keeps paying for fresh TLS handshakes.
+    """
+
+    async def create_session(self) -> aiohttp.ClientSession:
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=API_POOL_SIZE,
+                keepalive_timeout=API_KEEPALIVE,
+                ssl=self.ssl_context,
+            )
+        )
+        return self.session
+
+
+def _configure_api_session() -> None:
+    # No RETRY_ON_ERROR: a retried send_message whose first attempt reached
+    # Telegram before the connection dropped would reach the user twice.
+    if not isinstance(asyncio_helper.session_manager, _PooledSessionManager):
+        asyncio_helper.session_manager = _PooledSessionManager()
+
 
 class TerminBot:
-    def __init__(self, token: str, loader: MenuLoader, channel: Optional[str] = None):
-        self.bot = TeleBot(token, parse_mode="HTML")
+    def __init__(
+        self,
+        token: str,
+        loader: MenuLoader,
+        channel: Optional[str] = None,
+        search_cache_path: Optional[Path] = None,
+    ):
+        # Handlers only await Telegram I/O; menu lookups stay synchronous, so
+        # one event loop can keep many API calls in flight at once.
+        self.bot = AsyncTeleBot(token, parse_mode="HTML")
         self.loader = loader
         self.kbf = KeyboardFactory(channel)
+        # Menus are static, so every keyboard is built once and shared.
+        self._root_kb = self.kbf.build(None, loader.get_root())
+        self._keyboards: Dict[str, types.InlineKeyboardMarkup] = {
+            node.cb_data: self.kbf.build(node, node.children)
+            for node in loader.iter_items()
+        }
+        # (chat_id, message_id) → keyboard last put on that message, so taps
+        # that would re-send the same markup skip the API call.
+        self._last_kb: Dict[Tuple[int, int], types.InlineKeyboardMarkup] = {}
+        # FAQ traffic is a long tail around a few hot questions, which LFU
+        # keeps better than LRU; persisted so restarts start warm.
+        self._search_cache: LFUCache = LFUCache(maxsize=SEARCH_CACHE_SIZE)
+        self._search_cache_path = search_cache_path
+        self._load_search_cache()
         self._register_handlers()
 
     # Register telegram handlers ------------------------------------------
 
     def _register_handlers(self) -> None:
         @self.bot.message_handler(commands=["start", "help"])
-        def on_start(msg: types.Message):
+        async def on_start(msg: types.Message):
             welcome = (
                 "<b>Welcome to TerminJetzt Heilbronn!</b>\n"
                 "Use the buttons below to explore appointment info, docs, and FAQs."
             )
-            kb = self.kbf.build([], self.loader.get_root())
-            self.bot.send_message(msg.chat.id, welcome, reply_markup=kb)
+            sent = await self.bot.send_message(
+                msg.chat.id, welcome, reply_markup=self._root_kb
+            )
+            self._remember_kb(sent.chat.id, sent.message_id, self._root_kb)
 
         @self.bot.callback_query_handler(func=lambda c: True)
-        def on_callback(call: types.CallbackQuery):
+        async def on_callback(call: types.CallbackQuery):
             data = call.data or BACK_ROOT
-            if data == BACK_ROOT:
-                self._show_menu(call, [])
-                return
-            path = data.split(":")
-            item = self.loader.find_by_path(path)
+            # callback_data is the item's joined id path, so no split needed.
+            item = None if data == BACK_ROOT else self.loader.find_by_cb(data)
 
-            # Unknown → reset
+            # Back to root, or unknown → reset
             if item is None:
-                self._show_menu(call, [])
+                await self._show_menu(call, None)
                 return
 
             # Leaf node → show answer (stay on same path)
             if item.is_leaf() and item.answer:
-                title = item.breadcrumb(path)
+                kb = self._keyboard_for(item)
+                if self._kb_unchanged(call, kb):
+                    await self.bot.answer_callback_query(call.id)
+                    return
+                title = self.loader.breadcrumb(item)
                 text = f"<b>{title}</b>\n\n{item.answer}"
-                kb = self.kbf.build(path, ())
-                self.bot.edit_message_text(
+                await self.bot.edit_message_text(
                     text,
                     chat_id=call.message.chat.id,
                     message_id=call.message.message_id,
                     reply_markup=kb,
                 )
+                self._remember_kb(call.message.chat.id, call.message.message_id, kb)
             else:
                 # Non-leaf → open submenu
-                self._show_menu(call, path)
+                await self._show_menu(call, item)
 
         @self.bot.message_handler(func=lambda m: True)
-        def on_fallback(msg: types.Message):
+        async def on_fallback(msg: types.Message):
             answer = self._search(msg.text or "")
             if answer:
-                self.bot.reply_to(msg, answer)
+                await self.bot.reply_to(msg, answer)
             else:
-                self.bot.reply_to(msg, "Sorry, I didn't get that. Please use the menu.")
+                await self.bot.reply_to(
+                    msg, "Sorry, I didn't get that. Please use the menu."
+                )
 
     # Helpers --------------------------------------------------------------
 
-    def _show_menu(self, call: types.CallbackQuery, path: List[str]):
-        node = self.loader.find_by_path(path) if path else None
-        items = node.children if node else self.loader.get_root()
-        kb = self.kbf.build(path, items)
+    async def _show_menu(self, call: types.CallbackQuery, node: Optional[MenuItem]):
+        kb = self._keyboard_for(node)
+        if self._kb_unchanged(call, kb):
+            # Telegram would reject the edit as "message is not modified"
+            await self.bot.answer_callback_query(call.id)
+            return
         # Edit only the keyboard; keep the same text
-        self.bot.edit_message_reply_markup(
+        await self.bot.edit_message_reply_markup(
             call.message.chat.id, call.message.message_id, reply_markup=kb
         )
+        self._remember_kb(call.message.chat.id, call.message.message_id, kb)
+
+    def _kb_unchanged(
+        self, call: types.CallbackQuery, kb: types.InlineKeyboardMarkup
+    ) -> bool:
+        # Keyboards are prebuilt per node, so identity means identical markup.
+        key = (call.message.chat.id, call.message.message_id)
+        return self._last_kb.get(key) is kb
+
+    def _remember_kb(
+        self, chat_id: int, message_id: int, kb: types.InlineKeyboardMarkup
+    ) -> None:
+        key = (chat_id, message_id)
+        self._last_kb.pop(key, None)
+        self._last_kb[key] = kb
+        if len(self._last_kb) > LAST_KB_LIMIT:
+            # Dicts keep insertion order: drop the least recently edited one.
+            del self._last_kb[next(iter(self._last_kb))]
+
+    def _keyboard_for(self, node: Optional[MenuItem]) -> types.InlineKeyboardMarkup:
+        if node is None:
+            return self._root_kb
+        return self._keyboards[node.cb_data]
 
-    @lru_cache(maxsize=128)
     def _search(self, query: str) -> Optional[str]:
-        q_words = query.lower().split()
-        for root in self.loader.get_root():
-            for leaf in self._iterate_leaves(root):
-                if leaf.answer and any(w in leaf.answer.lower() for w in q_words):
-                    return leaf.answer
-        return None
-
-    def _iterate_leaves(self, item: MenuItem):
-        if item.is_leaf():
-            yield item
-        else:
-            for c in item.children:
-                yield from self._iterate_leaves(c)
+        # Case, spacing and punctuation don't change the result, so drop them
+        # before hitting the cache: "Times?" and " times " share one entry.
+        key = " ".join(_tokenize(query))
+        try:
+            return self._search_cache[key]
+        except KeyError:
+            pass
+        leaf = self.loader.search(key)
+        answer = leaf.answer if leaf else None
+        self._search_cache[key] = answer
+        return answer
+
+    def _load_search_cache(self) -> None:
+        if self._search_cache_path is None:
+            return
+        try:
+            fingerprint, entries = pickle.loads(self._search_cache_path.read_bytes())
+        except Exception:  # missing or unreadable → start cold
+            return
+        # Answers from another menu version would be stale.
+        if fingerprint != self.loader.fingerprint:
+            return
+        for query, answer in entries[:SEARCH_CACHE_SIZE]:
+            self._search_cache[query] = answer
+
+    def _save_search_cache(self) -> None:
+        if self._search_cache_path is None:
+            return
+        # Plain pairs rather than the LFUCache itself: portable across
+        # cachetools versions. Hit counts restart from zero.
+        entries = list(self._search_cache.items())
+        try:
+            self._search_cache_path.write_bytes(
+                pickle.dumps(
+                    (self.loader.fingerprint, entries),
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            )
+        except OSError as exc:
+            logging.warning("Search cache not saved: %s", exc)
 
     # API ------------------------------------------------------------------
 
     def run(self):
         logging.info("🤖 Bot is polling …")
-        self.bot.infinity_polling(skip_pending=True)
+        # `docker stop` sends SIGTERM; exit via SystemExit so `finally` runs.
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        _configure_api_session()
+        try:
+            asyncio.run(self.bot.infinity_polling(skip_pending=True, timeout=30))
+        finally:
+            self._save_search_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -270,9 +496,10 @@ def main():
     # Use script directory as reference so it runs from anywhere
     base_dir = Path(__file__).resolve().parent
     menu_path = base_dir / "data/menu.yaml"
+    search_cache_path = base_dir / "data/search_cache.pkl"
 
     loader = MenuLoader(menu_path, default_lang)
-    TerminBot(token, loader, channel).run()
+    TerminBot(token, loader, channel, search_cache_path).run()
 
 
 if __name__ == "__main__":